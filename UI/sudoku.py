@@ -2,16 +2,15 @@
 import tkinter as tk
 from tkinter import messagebox
 import random
-import copy
 import sys
 import os
+import threading
 
 # Add parent directory to Python path to allow imports from functional/imperative modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Functional solver imports
 from functional.functional_solver import solve as functional_solve
-from functional.utils_functional import to_immutable, from_immutable, has_conflict
 
 # Imperative solver imports
 from imperative.utils_imperative import (
@@ -20,57 +19,79 @@ from imperative.utils_imperative import (
     all_candidates,
     cell_has_no_candidates,
     copy_board,
+    BOX_OF,
+    UNITS,
     has_conflict as has_conflict_imp,
     is_solved as is_solved_imp
 )
 from imperative.solver_imperative import solve as imperative_solve
 
+# Compiled imperative core (optional): the C core when sudoku_core.so has
+# been built, otherwise the Numba one when numpy + numba are installed
+try:
+    from imperative.solver_imperative_c import solve as imperative_solve_fast
+except ImportError:
+    try:
+        from imperative.solver_imperative_numba import solve as imperative_solve_fast
+    except ImportError:
+        imperative_solve_fast = None
+
 GRID_SIZE = 9
 BOX_SIZE = 3
 REMOVED_CELLS = 40
 
+
 class Sudoku:
     def __init__(self):
         self.board = [[0]*GRID_SIZE for _ in range(GRID_SIZE)]
 
     def generate_full_board(self):
         self.board = [[0]*GRID_SIZE for _ in range(GRID_SIZE)]
-
-        def possible(r, c, val):
-            for j in range(GRID_SIZE):
-                if self.board[r][j] == val:
-                    return False
-            for i in range(GRID_SIZE):
-                if self.board[i][c] == val:
-                    return False
-            br = (r // BOX_SIZE) * BOX_SIZE
-            bc = (c // BOX_SIZE) * BOX_SIZE
-            for i in range(br, br+BOX_SIZE):
-                for j in range(bc, bc+BOX_SIZE):
-                    if self.board[i][j] == val:
-                        return False
-            return True
+        full = (1 << GRID_SIZE) - 1
+        # Candidate bitmasks per row/col/box: bit v-1 set <=> digit v still allowed
+        row_mask = [full]*GRID_SIZE
+        col_mask = [full]*GRID_SIZE
+        box_mask = [full]*GRID_SIZE
 
         def fill():
+            # MRV: branch on the empty cell with the fewest remaining candidates
+            best = None
+            best_count = GRID_SIZE + 1
             for i in range(GRID_SIZE):
                 for j in range(GRID_SIZE):
                     if self.board[i][j] == 0:
-                        nums = list(range(1, GRID_SIZE+1))
-                        random.shuffle(nums)
-                        for val in nums:
-                            if possible(i, j, val):
-                                self.board[i][j] = val
-                                if fill():
-                                    return True
-                                self.board[i][j] = 0
-                        return False
-            return True
+                        b = BOX_OF[i*GRID_SIZE + j]
+                        m = row_mask[i] & col_mask[j] & box_mask[b]
+                        count = bin(m).count("1")
+                        if count < best_count:
+                            best, best_count = (i, j, b, m), count
+            if best is None:
+                return True
+
+            i, j, b, m = best
+            nums = [val for val in range(1, GRID_SIZE+1) if m & (1 << (val-1))]
+            random.shuffle(nums)
+            for val in nums:
+                bit = 1 << (val-1)
+                self.board[i][j] = val
+                row_mask[i] ^= bit
+                col_mask[j] ^= bit
+                box_mask[b] ^= bit
+                if fill():
+                    return True
+                self.board[i][j] = 0
+                row_mask[i] ^= bit
+                col_mask[j] ^= bit
+                box_mask[b] ^= bit
+            return False
 
         fill()
         return self.board
 
     def make_puzzle(self, holes=REMOVED_CELLS):
+        # The full board is already a solution of the puzzle; keep a copy of it
         self.generate_full_board()
+        full_board = copy_board(self.board)
         positions = [(i,j) for i in range(GRID_SIZE) for j in range(GRID_SIZE)]
         random.shuffle(positions)
         removed = 0
@@ -78,7 +99,7 @@ class Sudoku:
             i, j = positions.pop()
             self.board[i][j] = 0
             removed += 1
-        return self.board
+        return self.board, full_board
 
 
 class SudokuGUI(tk.Frame):
@@ -89,7 +110,10 @@ class SudokuGUI(tk.Frame):
         self.original = None
         self.cells = {}
         self.selected = None
+        self._last_selected = None
+        self._painted = set()  # cells coloured by validate/hint, repainted on the next update
         self.use_functional = True  # default solver
+        self._puzzle_id = 0  # bumped per new puzzle; stale background solves are dropped
         self.create_widgets()
         self.new_puzzle()
 
@@ -101,23 +125,31 @@ class SudokuGUI(tk.Frame):
         grid_frame = tk.Frame(top_frame)
         grid_frame.grid(row=0, column=0, padx=10, pady=10)
 
+        # Keystrokes are filtered by Tk itself: only a single digit 1-9 or empty
+        vcmd = (self.parent.register(self._validate_digit), '%P')
+
         self.box_frames = {}
+        self._box_bg = {}
+        self._box_of = {}
         for box_row in range(BOX_SIZE):
             for box_col in range(BOX_SIZE):
                 frame_bg = "#F5F5F5" if (box_row + box_col) % 2 == 0 else "white"
                 frame = tk.Frame(grid_frame, highlightthickness=3, highlightbackground="black", bd=0, bg=frame_bg)
                 frame.grid(row=box_row, column=box_col)
                 self.box_frames[(box_row, box_col)] = frame
+                self._box_bg[(box_row, box_col)] = frame_bg
 
                 for i in range(BOX_SIZE):
                     for j in range(BOX_SIZE):
                         r = box_row * BOX_SIZE + i
                         c = box_col * BOX_SIZE + j
-                        e = tk.Entry(frame, width=2, font=("Helvetica",18), justify="center", bd=1)
+                        e = tk.Entry(frame, width=2, font=("Helvetica",18), justify="center", bd=1,
+                                     validate="key", validatecommand=vcmd)
                         e.grid(row=i, column=j, ipadx=6, ipady=6, padx=1, pady=1)
                         e.bind("<FocusIn>", self._make_focus_handler(r,c))
                         e.bind("<KeyRelease>", self._make_key_handler(r,c))
                         self.cells[(r,c)] = e
+                        self._box_of[(r,c)] = (box_row, box_col)
 
         # Buttons
         btn_frame = tk.Frame(top_frame)
@@ -129,12 +161,15 @@ class SudokuGUI(tk.Frame):
             ("Clear", self.clear_editable),
             ("Hint", self.give_hint)
         ]
+        self.buttons = {}
         for i, (txt, cmd) in enumerate(btns):
-            tk.Button(btn_frame, text=txt, command=cmd,
-                      font=("Helvetica",12,"bold"),
-                      bg="#4CAF50", fg="white",
-                      activebackground="#45A049",
-                      padx=10, pady=5, bd=3).grid(row=0, column=i, padx=5)
+            btn = tk.Button(btn_frame, text=txt, command=cmd,
+                            font=("Helvetica",12,"bold"),
+                            bg="#4CAF50", fg="white",
+                            activebackground="#45A049",
+                            padx=10, pady=5, bd=3)
+            btn.grid(row=0, column=i, padx=5)
+            self.buttons[txt] = btn
 
         # Solver choice (Functional / Imperative)
         solver_frame = tk.Frame(top_frame)
@@ -155,6 +190,10 @@ class SudokuGUI(tk.Frame):
         self.status_var.set(f"{mode} solver selected")
 
     # Focus & key handlers
+    @staticmethod
+    def _validate_digit(proposed):
+        return proposed == "" or (len(proposed) == 1 and proposed in "123456789")
+
     def _make_focus_handler(self, r, c):
         def handler(_):
             self.selected = (r,c)
@@ -164,18 +203,8 @@ class SudokuGUI(tk.Frame):
     def _make_key_handler(self, r, c):
         def handler(_):
             entry = self.cells[(r,c)]
-            txt = entry.get().strip()
-            if txt == "":
-                val = 0
-            else:
-                if not txt.isdigit() or txt == "0":
-                    entry.delete(0, tk.END)
-                    return
-                if len(txt) > 1:
-                    txt = txt[-1]
-                    entry.delete(0, tk.END)
-                    entry.insert(0, txt)
-                val = int(txt)
+            txt = entry.get()
+            val = int(txt) if txt else 0
 
             if self.original and self.original[r][c] == 0:
                 self.sudoku.board[r][c] = val
@@ -188,18 +217,15 @@ class SudokuGUI(tk.Frame):
 
     # ------------------------ NEW PUZZLE ------------------------
     def new_puzzle(self):
+        self._puzzle_id += 1
         self.status_var.set("Generating puzzle...")
         self.parent.update_idletasks()
 
-        puzzle = self.sudoku.make_puzzle()
-        self.original = copy.deepcopy(puzzle)
+        puzzle, full_board = self.sudoku.make_puzzle()
+        self.original = copy_board(puzzle)
 
-        # Solve puzzle in background for hints / solve button
-        if self.use_functional:
-            solved = functional_solve(copy.deepcopy(puzzle))
-        else:
-            solved = imperative_solve(copy.deepcopy(puzzle))
-        self.solved_board = solved
+        # The generated full board is the solution used for hints
+        self.solved_board = full_board
 
         for r in range(9):
             for c in range(9):
@@ -214,25 +240,51 @@ class SudokuGUI(tk.Frame):
                     e.config(background="white")
 
         self.status_var.set("New puzzle ready")
-        self._update_cell_styles()
+        self._update_cell_styles(force=True)
 
     # ------------------------ SOLVE ------------------------
     def solve_current(self):
         board = self.sudoku.board
+        if has_conflict_imp(board):
+            messagebox.showwarning("Sudoku", "Cannot solve: conflicts exist.")
+            self.status_var.set("Conflicts detected!")
+            return
         if self.use_functional:
-            if has_conflict(to_immutable(board)):
-                messagebox.showwarning("Sudoku", "Cannot solve: conflicts exist.")
-                self.status_var.set("Conflicts detected!")
-                return
-            solved = functional_solve(copy.deepcopy(board))
+            solver = functional_solve
         else:
-            if has_conflict_imp(board):
-                messagebox.showwarning("Sudoku", "Cannot solve: conflicts exist.")
-                self.status_var.set("Conflicts detected!")
-                return
-            solved = imperative_solve(copy.deepcopy(board))
+            # Prefer the compiled core when it is installed
+            solver = imperative_solve_fast if imperative_solve_fast is not None else imperative_solve
+
+        # Solve on a worker thread so the Tk main loop stays responsive;
+        # the worker gets a snapshot since the user may keep editing
+        self.buttons["Solve"].config(state="disabled")
+        self.status_var.set("Solving...")
+        threading.Thread(target=self._solve_worker,
+                         args=(solver, copy_board(board), self._puzzle_id),
+                         daemon=True).start()
+
+    def _solve_worker(self, solver, board, puzzle_id):
+        try:
+            solved = solver(board)
+        except Exception as exc:
+            # Still report back, or the Solve button would stay disabled
+            self.parent.after(0, self._solve_failed, exc)
+            return
+        # Hand the result back to the Tk thread
+        self.parent.after(0, self._apply_solution, solved, puzzle_id)
+
+    def _solve_failed(self, exc):
+        self.buttons["Solve"].config(state="normal")
+        self.status_var.set("Solver error.")
+        messagebox.showerror("Sudoku", f"Solver failed: {exc}")
+
+    def _apply_solution(self, solved, puzzle_id):
+        self.buttons["Solve"].config(state="normal")
+        if puzzle_id != self._puzzle_id:
+            return  # a new puzzle was generated while solving
 
         if solved is None:
+            self.status_var.set("No solution found.")
             messagebox.showinfo("Sudoku","No solution found.")
             return
 
@@ -249,26 +301,26 @@ class SudokuGUI(tk.Frame):
     # ------------------------ VALIDATE ------------------------
     def validate_current(self):
         board = self.sudoku.board
-        if self.use_functional:
-            board_immutable = to_immutable(board)
-            conflicts = has_conflict(board_immutable)
-        else:
-            conflicts = has_conflict_imp(board)
+        conflicts = has_conflict_imp(board)
 
         if not conflicts:
             self.status_var.set("Board valid.")
             messagebox.showinfo("Validate", "No conflicts!")
         else:
-            for r in range(9):
-                for c in range(9):
+            # One pass per unit: any value held by more than one cell conflicts
+            conflicted = set()
+            for unit in UNITS:
+                seen = {}
+                for (r, c) in unit:
                     val = board[r][c]
                     if val != 0:
-                        row_vals = [board[r][j] for j in range(9) if j != c]
-                        col_vals = [board[i][c] for i in range(9) if i != r]
-                        br, bc = (r//3)*3, (c//3)*3
-                        box_vals = [board[i][j] for i in range(br, br+3) for j in range(bc, bc+3) if (i,j)!=(r,c)]
-                        if val in row_vals or val in col_vals or val in box_vals:
-                            self.cells[(r,c)].config(background="#FFC3C3")
+                        seen.setdefault(val, []).append((r, c))
+                for cells in seen.values():
+                    if len(cells) > 1:
+                        conflicted.update(cells)
+            for rc in conflicted:
+                self.cells[rc].config(background="#FFC3C3")
+            self._painted.update(conflicted)
             self.status_var.set("Conflicts detected.")
             messagebox.showwarning("Validate", "There are conflicts.")
 
@@ -285,7 +337,7 @@ class SudokuGUI(tk.Frame):
                     e.config(background="white")
                     self.sudoku.board[r][c] = 0
         self.status_var.set("Cleared.")
-        self._update_cell_styles()
+        self._update_cell_styles(force=True)
 
     # ------------------------ HINT ------------------------
     def give_hint(self):
@@ -301,6 +353,7 @@ class SudokuGUI(tk.Frame):
                     e.delete(0, tk.END)
                     e.insert(0, str(v))
                     e.config(background="#E6FFE6")
+                    self._painted.add((r,c))
                     self.sudoku.board[r][c] = v
                     self.status_var.set(f"Hint: filled ({r+1},{c+1})")
                     return
@@ -308,11 +361,16 @@ class SudokuGUI(tk.Frame):
         messagebox.showinfo("Hint","No empty cells remaining.")
 
     # ------------------------ STYLE ------------------------
-    def _update_cell_styles(self):
-        for box_r in range(BOX_SIZE):
-            for box_c in range(BOX_SIZE):
-                bg = "#F5F5F5" if (box_r+box_c)%2==0 else "white"
-                self.box_frames[(box_r,box_c)].config(bg=bg)
+    def _highlight_region(self, cell):
+        # Cells sharing a row, column or box with `cell` (including itself)
+        sr, sc = cell
+        box = self._box_of[cell]
+        return {(r,c) for (r,c), b in self._box_of.items()
+                if r==sr or c==sc or b==box}
+
+    def _update_cell_styles(self, force=False):
+        prev = None if force else self._last_selected
+        self._last_selected = self.selected
 
         if not self.selected:
             for r in range(9):
@@ -322,17 +380,24 @@ class SudokuGUI(tk.Frame):
                         e.config(readonlybackground="#DDDDDD")
             return
 
+        # Only repaint cells whose highlight changed since the last selection,
+        # plus any validate/hint marks so they don't outlive the next edit
+        region = self._highlight_region(self.selected)
+        if prev is None:
+            dirty = self.cells.keys()
+        else:
+            dirty = (region ^ self._highlight_region(prev)) | {prev, self.selected} | self._painted
+        self._painted = set()
+
         sr, sc = self.selected
-        for r in range(9):
-            for c in range(9):
-                e = self.cells[(r,c)]
-                if (r,c) == (sr,sc):
-                    e.config(background="#BFDFFF")
-                elif r==sr or c==sc or (r//3, c//3)==(sr//3, sc//3):
-                    e.config(background="#F0F8FF")
-                else:
-                    box = self.box_frames[(r//3,c//3)]
-                    e.config(background=box.cget("bg"))
+        for (r, c) in dirty:
+            e = self.cells[(r,c)]
+            if (r,c) == (sr,sc):
+                e.config(background="#BFDFFF")
+            elif (r,c) in region:
+                e.config(background="#F0F8FF")
+            else:
+                e.config(background=self._box_bg[self._box_of[(r,c)]])
 
 
 def main():
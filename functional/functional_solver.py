@@ -1,36 +1,48 @@
+import os
+from functools import lru_cache
+from multiprocessing import Pool
 from typing import Optional, Tuple, Callable, TypeVar
 from functional.utils_functional import (
     Board,
-    CandidatesBoard,
-    all_candidates,
-    is_solved,
-    to_immutable,
-    from_immutable,
-    cell_has_no_candidates,
-    has_conflict,
+    State,
+    FULL_MASK,
+    POPCOUNT,
+    PEERS,
+    UNITS,
+    ALL_CELLS,
+    BOX_OF,
+    cell_mask,
+    cells_state,
+    to_cells,
+    from_cells,
+    digit_bit,
+    mask_digits,
+    remove_digit,
     map_2d,
     fold_board,
     custom_map,
     custom_filter,
     custom_reduce,
+    custom_any,
 )
 
 T = TypeVar('T')
 
-def try_each(test_func: Callable[[T], Optional[Board]]) -> Callable[[Tuple[T, ...]], Optional[Board]]:
+def try_each(test_func: Callable[[T], Optional[State]]) -> Callable[[Tuple[T, ...]], Optional[State]]:
     """
     Higher-order function that creates a 'try each' function.
     Takes a test function and returns a function that tries it on each item.
     Returns the first successful result or None.
     This demonstrates function composition and closures.
+    Iterates instead of recursing on items[1:], which would copy the tail
+    tuple at every step.
     """
-    def try_all(items: Tuple[T, ...]) -> Optional[Board]:
-        if not items:
-            return None
-        result = test_func(items[0])
-        if result is not None:
-            return result
-        return try_all(items[1:])  # Fully recursive, no loops
+    def try_all(items: Tuple[T, ...]) -> Optional[State]:
+        for item in items:
+            result = test_func(item)
+            if result is not None:
+                return result
+        return None
 
     return try_all
 
@@ -41,151 +53,351 @@ def compose_board_transforms(
     Higher-order function that composes board transformation functions.
     Takes multiple functions and returns their composition (right to left).
     If any function returns None, the whole composition returns None.
-    Purely recursive, no loops.
     """
     def composed(board: Board) -> Optional[Board]:
-        def apply_funcs(idx: int, result: Optional[Board]) -> Optional[Board]:
+        result: Optional[Board] = board
+        for func in reversed(funcs):
+            result = func(result)
             if result is None:
                 return None
-            if idx < 0:
-                return result
-            return apply_funcs(idx - 1, funcs[idx](result))
-        return apply_funcs(len(funcs) - 1, board)
+        return result
     return composed
 
 
-def set_cell(board: Board, r: int, c: int, val: int) -> Board:
+def set_cell(state: State, r: int, c: int, val: int) -> State:
     """
-    Create a new board with a single cell updated (immutable update).
-    Original board remains unchanged - core principle of functional programming.
+    Create a new state with a single cell updated (immutable update).
+    The digit's bit is removed from the masks of row r, column c and the box.
+    Original state remains unchanged - core principle of functional programming.
     """
-    def build_row(row_idx: int, row_data: Tuple[int, ...]) -> Tuple[int, ...]:
-        if row_idx != r:
-            return row_data
-        return custom_map(
-            lambda col_idx: val if col_idx == c else row_data[col_idx],
-            range(9)
-        )
+    cells, rows, cols, boxes = state
+    # One bytes slice-and-join replaces the old row and board tuple rebuilds
+    i = r * 9 + c
+    bit = digit_bit(val)
+    return (
+        cells[:i] + bytes((val,)) + cells[i + 1:],
+        remove_digit(rows, r, bit),
+        remove_digit(cols, c, bit),
+        remove_digit(boxes, BOX_OF[r * 9 + c], bit),
+    )
+
+
+def apply_singles(state: State, singles: Tuple[Tuple[int, int, int], ...]) -> Optional[State]:
+    """
+    Place a batch of (r, c, digit_bit) singles and return the new state.
+    Builds the result once instead of one set_cell copy per placement:
+    the cells and masks are copied into local mutable buffers, updated,
+    and frozen again. The input state is never modified.
+    Returns None if two singles contradict each other.
+    """
+    cells, rows, cols, boxes = state
+    grid = bytearray(cells)
+    row_m, col_m, box_m = list(rows), list(cols), list(boxes)
+    for r, c, bit in singles:
+        i = r * 9 + c
+        b = BOX_OF[i]
+        if grid[i]:
+            # Same cell found twice: fine if it is the same digit
+            if digit_bit(grid[i]) != bit:
+                return None
+            continue
+        # Two singletons in one unit may claim the same digit: that is a contradiction
+        if not row_m[r] & col_m[c] & box_m[b] & bit:
+            return None
+        grid[i] = bit.bit_length()
+        row_m[r] &= ~bit
+        col_m[c] &= ~bit
+        box_m[b] &= ~bit
+    return (bytes(grid), tuple(row_m), tuple(col_m), tuple(box_m))
+
+
+def eliminate_naked_pairs(cands: Tuple[int, ...]) -> Tuple[int, ...]:
+    """
+    Naked pairs: when two cells of a unit hold the same two candidates, those
+    digits can be removed from every other cell of that unit.
+    Takes and returns a flat 81-tuple of candidate masks (0 for filled cells).
+    Pure function: each unit produces a new tuple via custom_reduce.
+    """
+    def unit_step(cs: Tuple[int, ...], unit: Tuple[Tuple[int, int], ...]) -> Tuple[int, ...]:
+        idxs = custom_map(lambda rc: rc[0] * 9 + rc[1], unit)
+        masks = custom_map(lambda i: cs[i], idxs)
+        pairs = custom_filter(lambda m: POPCOUNT[m] == 2 and masks.count(m) == 2, masks)
+        if not pairs:
+            return cs
+        pair_bits = custom_reduce(lambda acc, m: acc | m, pairs, 0)
+        # The pair cells keep their digits; every other cell loses them
+        updated = dict(custom_map(
+            lambda i: (i, cs[i] if cs[i] in pairs else cs[i] & ~pair_bits),
+            idxs
+        ))
+        return tuple(updated.get(i, m) for i, m in enumerate(cs))
+
+    return custom_reduce(unit_step, UNITS, cands)
 
-    return custom_map(
-        lambda row_idx: build_row(row_idx, board[row_idx]),
-        range(9)
+
+def unit_singles(state: State) -> Optional[Tuple[Tuple[int, int, int], ...]]:
+    """
+    Find placements that naked singles alone miss: hidden singles (a digit
+    with only one possible cell in a unit) plus any naked single exposed by
+    naked-pair elimination. Placements are (r, c, digit_bit) like in propagate.
+    Returns None if a unit has a missing digit with nowhere left to go.
+    """
+    cells = state[0]
+    cands = eliminate_naked_pairs(tuple(
+        cell_mask(state, r, c) if cells[r * 9 + c] == 0 else 0
+        for r in range(9) for c in range(9)
+    ))
+    if custom_any(custom_map(lambda i: cells[i] == 0 and cands[i] == 0, range(81))):
+        return None
+    naked = custom_map(
+        lambda i: (i // 9, i % 9, cands[i]),
+        custom_filter(lambda i: cands[i] and cands[i] & (cands[i] - 1) == 0, range(81))
     )
 
+    def unit_hidden(acc: Optional[Tuple[Tuple[int, int, int], ...]],
+                    unit: Tuple[Tuple[int, int], ...]) -> Optional[Tuple[Tuple[int, int, int], ...]]:
+        if acc is None:
+            return None
+        # One pass over the unit's masks: `once` collects digits seen in at
+        # least one cell, `more` those seen in two or more
+        placed = once = more = 0
+        for r, c in unit:
+            value = cells[r * 9 + c]
+            if value:
+                placed |= digit_bit(value)
+            else:
+                mask = cands[r * 9 + c]
+                more |= once & mask
+                once |= mask
+        # A digit neither placed nor possible anywhere: dead end
+        if (placed | once) != FULL_MASK:
+            return None
+        only = once & ~more
+        if not only:
+            return acc
+        hidden = custom_map(
+            lambda rc: (rc[0], rc[1], cands[rc[0] * 9 + rc[1]] & only),
+            custom_filter(lambda rc: cands[rc[0] * 9 + rc[1]] & only, unit)
+        )
+        # One cell can't be the only home of two different digits
+        if custom_any(custom_map(lambda rcm: rcm[2] & (rcm[2] - 1), hidden)):
+            return None
+        return acc + hidden
+
+    hidden = custom_reduce(unit_hidden, UNITS, ())
+    if hidden is None:
+        return None
+    return tuple(sorted(frozenset(naked + hidden)))
 
-def propagate(board: Board) -> Optional[Board]:
+
+def propagate(state: State) -> Optional[State]:
     """
     Apply constraint propagation: repeatedly fill cells that have only one candidate.
-    Continues recursively until no more changes occur (fixed point reached).
+    A cell's candidates are the AND of its row/col/box masks, so a singleton is a
+    mask with exactly one bit set (m & (m - 1) == 0).
+    Placing a digit only changes the masks seen by its peers, so after the first
+    full scan only the peers of newly placed cells are re-examined.
+    When no naked single remains, hidden singles and naked pairs are tried.
+    Loops until no more changes occur (fixed point reached).
     Returns None if contradiction detected (no solution possible).
     """
-    def all_coords(r: int = 0, c: int = 0) -> Tuple[Tuple[int, int], ...]:
-        # Recursively generate all board coordinates as a tuple of pairs
-        if r == 9:
-            return ()
-        if c == 8:
-            return ((r, c),) + all_coords(r + 1, 0)
-        return ((r, c),) + all_coords(r, c + 1)
-
-    def find_singletons(b: Board, cands: CandidatesBoard) -> Tuple[Tuple[int, int, int], ...]:
-        coords = all_coords()
-        singles_filtered = custom_filter(
-            lambda rc: b[rc[0]][rc[1]] == 0 and len(cands[rc[0]][rc[1]]) == 1,
-            coords
-        )
-        return custom_map(
-            lambda rc: (rc[0], rc[1], cands[rc[0]][rc[1]][0]),
-            singles_filtered
-        )
+    def empty_cell_masks(s: State, coords: Tuple[Tuple[int, int], ...]) -> Tuple[Tuple[int, int, int], ...]:
+        cells = s[0]
+        empty = custom_filter(lambda rc: cells[rc[0] * 9 + rc[1]] == 0, coords)
+        return custom_map(lambda rc: (rc[0], rc[1], cell_mask(s, rc[0], rc[1])), empty)
 
-    def apply_singles(b: Board, singles: Tuple[Tuple[int, int, int], ...]) -> Board:
-        return custom_reduce(
-            lambda acc_b, rcv: set_cell(acc_b, rcv[0], rcv[1], rcv[2]),
+    def dirty_coords(singles: Tuple[Tuple[int, int, int], ...]) -> Tuple[Tuple[int, int], ...]:
+        # Union of the peers of every placed cell: the only masks that changed
+        return tuple(sorted(custom_reduce(
+            lambda acc, rcm: acc | frozenset(PEERS[rcm[0] * 9 + rcm[1]]),
             singles,
-            b
-        )
+            frozenset()
+        )))
 
-    def loop(b: Board) -> Optional[Board]:
-        cands = all_candidates(b)
-        if cell_has_no_candidates(cands):
+    s: State = state
+    coords = ALL_CELLS
+    # Iterate to the fixed point: CPython has no tail-call elimination
+    while True:
+        cells = empty_cell_masks(s, coords)
+        if custom_any(custom_map(lambda rcm: rcm[2] == 0, cells)):
             return None
-        singles = find_singletons(b, cands)
+        singles = custom_filter(lambda rcm: rcm[2] & (rcm[2] - 1) == 0, cells)
         if not singles:
-            return b
-        b2 = apply_singles(b, singles)
-        return loop(b2)
-
-    return loop(board)
+            # Naked singles exhausted: fall back to the unit-wide rules
+            singles = unit_singles(s)
+            if singles is None:
+                return None
+            if not singles:
+                return s
+        s2 = apply_singles(s, singles)
+        if s2 is None:
+            return None
+        s, coords = s2, dirty_coords(singles)
 
 
-def choose_mrv_cell(board: Board) -> Optional[Tuple[int, int, Tuple[int, ...]]]:
+def choose_mrv_cell(state: State) -> Optional[Tuple[int, int, Tuple[int, ...]]]:
     """
     Choose cell with Minimum Remaining Values (MRV heuristic).
     Selects empty cell with fewest candidates to minimize search branching.
-    Uses functional reduce to find minimum. No loops.
-    """
-    cands = all_candidates(board)
-
-    def all_empty_cells(r: int = 0, c: int = 0) -> Tuple[Tuple[int, int, Tuple[int, ...]], ...]:
-        # Recursively generate all empty cells (r, c, cands[r][c])
-        if r == 9:
-            return ()
-        if c == 8:
-            rest = all_empty_cells(r + 1, 0)
-        else:
-            rest = all_empty_cells(r, c + 1)
-        if board[r][c] == 0:
-            return ((r, c, cands[r][c]),) + rest
-        else:
-            return rest
-
-    all_cells = all_empty_cells()
-    if not all_cells:
+    Candidate counts come from the POPCOUNT lookup table over cell masks.
+    After propagate no cell has fewer than 2 candidates, so the scan stops
+    at the first 2-candidate cell instead of visiting every empty cell.
+    """
+    cells = state[0]
+    best: Optional[Tuple[int, int, int]] = None
+    best_count = 10
+    for r, c in ALL_CELLS:
+        if cells[r * 9 + c] != 0:
+            continue
+        mask = cell_mask(state, r, c)
+        count = POPCOUNT[mask]
+        if count == 0:
+            return None
+        if count < best_count:
+            best, best_count = (r, c, mask), count
+            if count <= 2:
+                break
+
+    if best is None:
         return None
+    r, c, mask = best
+    return (r, c, mask_digits(mask))
 
-    def min_candidates(acc: Optional[Tuple[int, int, Tuple[int, ...]]],
-                       cell: Tuple[int, int, Tuple[int, ...]]) -> Optional[Tuple[int, int, Tuple[int, ...]]]:
-        _, _, cell_cands = cell
-        if len(cell_cands) == 0:
-            return None
-        if acc is None or len(cell_cands) < len(acc[2]):
-            return cell
-        return acc
+def order_lcv(state: State, r: int, c: int, candidates: Tuple[int, ...]) -> Tuple[int, ...]:
+    """
+    Order candidates by Least Constraining Value: digits that appear in the
+    fewest empty peers' candidate masks come first, since placing them
+    removes the fewest options elsewhere and is more likely to succeed.
+    Ties keep the natural 1-9 order (sorted is stable).
+    """
+    cells = state[0]
+    peer_masks = custom_map(
+        lambda rc: cell_mask(state, rc[0], rc[1]),
+        custom_filter(lambda rc: cells[rc[0] * 9 + rc[1]] == 0, PEERS[r * 9 + c])
+    )
+    return tuple(sorted(
+        candidates,
+        key=lambda val: sum(1 for m in peer_masks if m & digit_bit(val))
+    ))
 
-    return custom_reduce(min_candidates, all_cells, None)
 
-def search(board: Board) -> Optional[Board]:
+@lru_cache(maxsize=4096)
+def search(state: State) -> Optional[State]:
     """
     Recursive backtracking search with constraint propagation.
     Tries each candidate value for the chosen cell, recursing on success.
     Backtracks (returns None) if a branch leads to contradiction.
-    Pure functional approach - no state mutation, just recursive exploration.
+    Pure functional approach - no state mutation, just recursive exploration;
+    each branch receives its own snapshot of the board and masks.
+    Because it is pure and states are hashable tuples, results are memoized:
+    re-solving a board (or one reached earlier by propagation) is a lookup.
     """
-    p = propagate(board)
+    p = propagate(state)
     if p is None:
         return None
-    if is_solved(p):
+    if 0 not in p[0]:  # no empty cell left
         return p
+    return branch(p)
+
+
+def branch(p: State) -> Optional[State]:
+    """
+    The branching half of search, for a state that is already propagated
+    and not yet solved: pick the MRV cell and search each candidate.
+    Lets callers that have just propagated skip a second propagate pass.
+    """
     choice = choose_mrv_cell(p)
     if choice is None:
         return None
     r, c, candidates = choice
     test_candidate = lambda val: search(set_cell(p, r, c, val))
     try_all_candidates = try_each(test_candidate)
-    return try_all_candidates(candidates)
+    return try_all_candidates(order_lcv(p, r, c, candidates))
 
 
-def solve(input_board) -> Optional[list]:
+PARALLEL_MIN_BRANCHES = 3  # fewest independent sub-problems worth racing on a process pool
+FRONTIER_PER_WORKER = 4    # sub-problems queued per worker, so idle workers can pick up more
+
+
+def expand_frontier(state: State, target: int) -> Tuple[Optional[State], Tuple[State, ...]]:
+    """
+    Split the search tree breadth-first, one level at a time, until there are
+    at least `target` independent sub-problems (or the tree runs out).
+    Each level propagates its states and branches on their MRV cell in LCV
+    order, so the frontier keeps the order a serial search would visit.
+    Returns (solution, ()) if a solution turns up while splitting,
+    otherwise (None, frontier); an empty frontier means no solution.
+    """
+    frontier: Tuple[State, ...] = (state,)
+    while len(frontier) < target:
+        next_level: Tuple[State, ...] = ()
+        for s in frontier:
+            p = propagate(s)
+            if p is None:
+                continue
+            if 0 not in p[0]:  # no empty cell left
+                return p, ()
+            choice = choose_mrv_cell(p)
+            if choice is None:
+                continue
+            r, c, candidates = choice
+            next_level += custom_map(
+                lambda val: set_cell(p, r, c, val),
+                order_lcv(p, r, c, candidates)
+            )
+        if not next_level:
+            return None, ()
+        frontier = next_level
+    return None, frontier
+
+
+def parallel_search(state: State, max_workers: Optional[int] = None) -> Optional[State]:
+    """
+    Split the tree into about FRONTIER_PER_WORKER sub-problems per worker
+    (expand_frontier) and search them on a process pool; the first solution
+    found wins, and the workers still searching losing branches are then
+    terminated. With a single worker, or fewer than PARALLEL_MIN_BRANCHES
+    sub-problems, the search runs serially.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1:
+        return search(state)
+    solution, frontier = expand_frontier(state, workers * FRONTIER_PER_WORKER)
+    if solution is not None or not frontier:
+        return solution
+    if len(frontier) < PARALLEL_MIN_BRANCHES:
+        return try_each(search)(frontier)
+
+    # Leaving the with-block calls pool.terminate(), which kills the workers
+    # still searching losing branches instead of waiting for them
+    with Pool(processes=workers) as pool:
+        for result in pool.imap_unordered(search, frontier):
+            if result is not None:
+                return result
+        return None
+
+
+def solve(input_board, parallel: bool = False) -> Optional[list]:
     """
     Public API: solve a Sudoku puzzle.
     Accepts mutable list-of-lists or immutable tuple-of-tuples.
     Returns solution as list-of-lists, or None if no solution exists.
     Pure function - input never modified, always returns new structure.
+    With parallel=True sub-searches are raced on a process pool.
+    The board crosses the boundary as 81 bytes in each direction; the
+    conflict check happens while its masks are built.
     """
-    b = to_immutable(input_board) if isinstance(input_board, list) else input_board
-    if has_conflict(b):
+    state = cells_state(to_cells(input_board))
+    if state is None:
+        return None
+    # Many easy puzzles fall to propagation alone: answer them without
+    # entering the search machinery at all
+    p = propagate(state)
+    if p is None:
         return None
-    res = search(b)
+    if 0 not in p[0]:  # no empty cell left
+        return from_cells(p[0])
+    res = parallel_search(p) if parallel else branch(p)
     if res is None:
         return None
-    return from_immutable(res)
\ No newline at end of file
+    return from_cells(res[0])
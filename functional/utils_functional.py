@@ -1,9 +1,15 @@
 
-from typing import Tuple, List, Callable, TypeVar
+from typing import Tuple, List, Callable, Optional, TypeVar
 
 # Types
 Board = Tuple[Tuple[int, ...], ...]                # immutable 9x9 board
-CandidatesBoard = Tuple[Tuple[Tuple[int, ...], ...], ...]  # 9x9 of candidate tuples
+CandidatesBoard = Tuple[Tuple[int, ...], ...]     # 9x9 of candidate bitmasks
+Masks = Tuple[int, ...]                            # 9 candidate bitmasks (bit d-1 set <=> digit d allowed)
+Cells = bytes                                      # 81 digits in row-major order, 0 = empty
+State = Tuple[Cells, Masks, Masks, Masks]          # cells + row/col/box candidate masks
+
+FULL_MASK = 0x1FF                                  # all nine digits still available
+POPCOUNT = tuple(bin(m).count('1') for m in range(512))  # number of candidates in a mask
 
 # Generic type variables for higher-order functions
 T = TypeVar('T')
@@ -13,16 +19,15 @@ def custom_map(func: Callable[[T], U], items) -> Tuple[U, ...]:
     """
     custom_map applies a given function `func` to each element in the input
     sequence `items`, returning an immutable tuple with all results.
-    It's a recursive, functional-style replacement for Python's built-in map,
+    It's a functional-style replacement for Python's built-in map,
     but always returns a tuple (never a list or generator).
+    The tuple is built once from a generator; recursing on items[1:] would
+    copy the tail and the partial result at every step (O(n^2)).
     
     Example:
         custom_map(lambda x: x * 2, [1, 2, 3])  # returns (2, 4, 6)
     """
-    items_tuple = tuple(items)
-    if not items_tuple:
-        return ()
-    return (func(items_tuple[0]),) + custom_map(func, items_tuple[1:])
+    return tuple(func(x) for x in items)
 
 
 def custom_filter(predicate: Callable[[T], bool], items) -> Tuple[T, ...]:
@@ -34,61 +39,48 @@ def custom_filter(predicate: Callable[[T], bool], items) -> Tuple[T, ...]:
     Example:
         custom_filter(lambda x: x > 0, [-1, 0, 1, 2])  # returns (1, 2)
     """
-    items_tuple = tuple(items)
-    if not items_tuple:
-        return ()
-    head, *tail = items_tuple
-    filtered_tail = custom_filter(predicate, tail)
-    if predicate(head):
-        return (head,) + filtered_tail
-    return filtered_tail
+    return tuple(x for x in items if predicate(x))
 
 
 def custom_reduce(func: Callable[[U, T], U], items, initializer: U) -> U:
     """
     custom_reduce reduces the sequence `items` into a single value by
-    recursively applying the binary function `func`, starting from
+    applying the binary function `func` left to right, starting from
     `initializer`. Like functools.reduce but functional and always explicit.
     
     Example:
         custom_reduce(lambda acc, x: acc + x, [1,2,3], 0)  # returns 6
     """
-    items_tuple = tuple(items)
-    if not items_tuple:
-        return initializer
-    return custom_reduce(func, items_tuple[1:], func(initializer, items_tuple[0]))
+    acc = initializer
+    for x in items:
+        acc = func(acc, x)
+    return acc
 
 
 def custom_all(items) -> bool:
     """
     custom_all returns True if every value in the iterable `items`
-    evaluates as True, otherwise returns False. It's like built-in all()
-    but implemented recursively.
+    evaluates as True, otherwise returns False. Delegates to built-in all(),
+    which stops at the first falsy value.
     
     Example:
         custom_all([1, True, "nonempty"])  # returns True
         custom_all([1, 0, 2])              # returns False
     """
-    items_tuple = tuple(items)
-    if not items_tuple:
-        return True
-    return bool(items_tuple[0]) and custom_all(items_tuple[1:])
+    return all(items)
 
 
 def custom_any(items) -> bool:
     """
     custom_any returns True if any value in the iterable `items`
-    evaluates as True, otherwise returns False. Equivalent to built-in any()
-    but recursively implemented.
+    evaluates as True, otherwise returns False. Delegates to built-in any(),
+    which stops at the first truthy value.
     
     Example:
         custom_any([0, 0, 3])  # returns True
         custom_any([0, None])  # returns False
     """
-    items_tuple = tuple(items)
-    if not items_tuple:
-        return False
-    return bool(items_tuple[0]) or custom_any(items_tuple[1:])
+    return any(items)
 
 def map_2d(func: Callable[[int, int], T], rows: int = 9, cols: int = 9) -> Tuple[Tuple[T, ...], ...]:
     """
@@ -122,18 +114,7 @@ def filter_and_transform(
     Example:
         filter_and_transform(lambda x: x > 2, str, (1,2,3,4))  # returns ('3', '4')
     """
-    def process_item(item: T) -> Tuple[U, ...]:
-        if predicate(item):
-            return (transformer(item),)
-        return ()
-    
-    # Recursively process items
-    def process_all(remaining: Tuple[T, ...]) -> Tuple[U, ...]:
-        if not remaining:
-            return ()
-        return process_item(remaining[0]) + process_all(remaining[1:])
-    
-    return process_all(items)
+    return tuple(transformer(x) for x in items if predicate(x))
 
 def fold_board(
     func: Callable[[T, int, int, int], T],
@@ -145,25 +126,12 @@ def fold_board(
     Takes a function (accumulator, row, col, value) -> new_accumulator.
     Returns the final accumulated value.
     """
-    def fold_row(acc: T, r: int, row_data: Tuple[int, ...]) -> T:
-        def fold_col(acc_inner: T, c: int) -> T:
-            return func(acc_inner, r, c, row_data[c])
-        
-        # Fold over columns recursively
-        def fold_cols_recursive(acc_inner: T, col_idx: int) -> T:
-            if col_idx >= 9:
-                return acc_inner
-            return fold_cols_recursive(fold_col(acc_inner, col_idx), col_idx + 1)
-        
-        return fold_cols_recursive(acc, 0)
-    
-    # Fold over rows recursively
-    def fold_rows_recursive(acc: T, row_idx: int) -> T:
-        if row_idx >= 9:
-            return acc
-        return fold_rows_recursive(fold_row(acc, row_idx, board[row_idx]), row_idx + 1)
-    
-    return fold_rows_recursive(initial, 0)
+    # A flat loop: one frame for the whole board instead of nested recursion per cell
+    acc = initial
+    for r, row_data in enumerate(board):
+        for c, value in enumerate(row_data):
+            acc = func(acc, r, c, value)
+    return acc
 
 
 
@@ -189,109 +157,130 @@ def col_values(board: Board, c: int) -> Tuple[int, ...]:
 
 def box_values(board: Board, r: int, c: int) -> Tuple[int, ...]:
     """Get all non-zero values from the 3x3 box containing cell (r, c)"""
-    br, bc = (r // 3) * 3, (c // 3) * 3
-    
-    # Recursive helper to collect box values row by row
-    def collect_rows(row_idx: int) -> Tuple[int, ...]:
-        if row_idx >= br + 3:
-            return ()  # base case: no more rows
-        # Get values from current row in the box, filter non-zeros via custom_filter
-        row_vals = custom_filter(
-            lambda v: v != 0,
-            tuple(board[row_idx][col] for col in range(bc, bc + 3))
-        )
-        # Recursively process remaining rows and concatenate
-        return row_vals + collect_rows(row_idx + 1)
-    
-    return collect_rows(br)
+    box = tuple(board[i][j] for i, j in BOX_CELLS[BOX_OF[r * 9 + c]])
+    return custom_filter(lambda v: v != 0, box)
 
-def candidates_for(board: Board, r: int, c: int) -> Tuple[int, ...]:
-    """Get all valid candidates for a cell (1-9 that don't violate constraints)"""
+def candidates_for(board: Board, r: int, c: int) -> int:
+    """
+    Get all valid candidates for a cell as a 9-bit mask
+    (bit d-1 set <=> digit d doesn't violate constraints).
+    Use mask_digits to decode the mask into a tuple of digits.
+    """
     if board[r][c] != 0:
-        return (board[r][c],)  # Cell already filled
+        return digit_bit(board[r][c])  # Cell already filled
     
-    # Functionally combine all used values from row, column, and box
-    used = set(row_values(board, r)) | set(col_values(board, c)) | set(box_values(board, r, c))
+    # OR the bit of every digit seen among the 20 precomputed peers into one
+    # int; no sets or value tuples are built
+    used = custom_reduce(lambda mask, rc: mask | (1 << board[rc[0]][rc[1]]), PEERS[r * 9 + c], 0)
     
-    # Filter digits 1-9 to find available candidates
-    return custom_filter(lambda x: x not in used, tuple(range(1, 10)))
+    # Bit v of `used` marks digit v (bit 0 collects the empty cells), so
+    # shifting by one lines it up with the candidate mask
+    return FULL_MASK & ~(used >> 1)
 
 def all_candidates(board: Board) -> CandidatesBoard:
-    """Compute candidates for every cell in the board using custom higher-order function"""
+    """Compute candidate masks for every cell in the board using custom higher-order function"""
     return map_2d(lambda r, c: candidates_for(board, r, c))
 
 def is_solved(board: Board) -> bool:
-    """Check if board is completely filled (no zeros remaining) using custom fold"""
-    return fold_board(
-        lambda acc, r, c, value: acc and (value != 0),
-        board,
-        True  # initial: assume solved until we find a zero
-    )
+    """Check if board is completely filled (no zeros remaining); stops at the first empty cell"""
+    return custom_all(value != 0 for row in board for value in row)
 
 def has_conflict(board: Board) -> bool:
-    """Check if any row, column, or box has duplicate non-zero values (pure recursion, no loops)"""
+    """Check if any row, column, or box has duplicate non-zero values"""
 
-    # Pure recursive function to check if a tuple has duplicate non-zero values
+    # A unit has duplicates when its non-zero digits outnumber their set.
+    # filter() and set() walk the values in C, with no Python call per cell.
     def has_duplicates(values: Tuple[int, ...]) -> bool:
-        # Filter out zeros using recursion
-        def filter_nonzero(idx: int, acc: Tuple[int, ...]) -> Tuple[int, ...]:
-            if idx == len(values):
-                return acc
-            val = values[idx]
-            if val != 0:
-                return filter_nonzero(idx + 1, acc + (val,))
-            return filter_nonzero(idx + 1, acc)
-        non_zero = filter_nonzero(0, ())
-        # Check for duplicates recursively, not using set
-        def has_dupe_rec(seq: Tuple[int, ...], seen: Tuple[int, ...]) -> bool:
-            if not seq:
-                return False
-            if seq[0] in seen:
-                return True
-            return has_dupe_rec(seq[1:], seen + (seq[0],))
-        return has_dupe_rec(non_zero, ())
-
-    # Recursively check all rows for duplicates
-    def rows_conflict_rec(idx: int) -> bool:
-        if idx == 9:
-            return False
-        return has_duplicates(board[idx]) or rows_conflict_rec(idx + 1)
-
-    # Recursively check all columns for duplicates
-    def cols_conflict_rec(idx: int) -> bool:
-        if idx == 9:
-            return False
-        # Construct the column recursively
-        def build_col(ci: int, acc: Tuple[int, ...]) -> Tuple[int, ...]:
-            if ci == 9:
-                return acc
-            return build_col(ci + 1, acc + (board[ci][idx],))
-        col = build_col(0, ())
-        return has_duplicates(col) or cols_conflict_rec(idx + 1)
-
-    # Recursively check all 3x3 boxes for duplicates
-    def boxes_conflict_rec(index: int) -> bool:
-        if index == 9:
-            return False
-        br = (index // 3) * 3
-        bc = (index % 3) * 3
-        # Collect box values recursively
-        def box_vals_rec(dr: int, dc: int, acc: Tuple[int, ...]) -> Tuple[int, ...]:
-            if dr == 3:
-                return acc
-            if dc == 3:
-                return box_vals_rec(dr + 1, 0, acc)
-            return box_vals_rec(dr, dc + 1, acc + (board[br + dr][bc + dc],))
-        vals = box_vals_rec(0, 0, ())
-        return has_duplicates(vals) or boxes_conflict_rec(index + 1)
-
-    return rows_conflict_rec(0) or cols_conflict_rec(0) or boxes_conflict_rec(0)
+        non_zero = tuple(filter(None, values))
+        return len(non_zero) != len(set(non_zero))
+
+    # Rows are the board itself and zip(*board) transposes all nine columns
+    # in one C-level call; boxes are gathered through BOX_CELLS
+    cols = tuple(zip(*board))
+    boxes = tuple(tuple(board[r][c] for r, c in box) for box in BOX_CELLS)
+    # custom_any stops at the first unit with a duplicate
+    return custom_any(has_duplicates(values) for values in board + cols + boxes)
 
 
 def cell_has_no_candidates(cands_board: CandidatesBoard) -> bool:
-    """Check if any cell has no valid candidates (unsolvable state) using custom fold"""
-    return fold_board(
-        lambda acc, r, c, cands: acc or (len(cands) == 0),
-        cands_board,
-        False  # initial: assume no empty candidates until we find one
+    """Check if any cell has no valid candidates (empty mask, unsolvable state); stops at the first one"""
+    return custom_any(mask == 0 for row in cands_board for mask in row)
+
+
+ALL_CELLS = tuple((r, c) for r in range(9) for c in range(9))  # every (r, c) in row-major order
+BOX_OF = tuple((r // 3) * 3 + c // 3 for r in range(9) for c in range(9))  # BOX_OF[r * 9 + c] -> box 0-8
+
+
+def digit_bit(value: int) -> int:
+    """Bitmask with only the bit for digit `value` (1-9) set"""
+    return 1 << (value - 1)
+
+
+def mask_digits(mask: int) -> Tuple[int, ...]:
+    """Decode a candidate bitmask into the tuple of digits it contains"""
+    return custom_filter(lambda d: mask & digit_bit(d), tuple(range(1, 10)))
+
+
+def remove_digit(masks: Masks, idx: int, bit: int) -> Masks:
+    """Return new masks with `bit` cleared from the mask at position `idx`"""
+    return masks[:idx] + (masks[idx] & ~bit,) + masks[idx + 1:]
+
+
+def to_cells(board) -> Cells:
+    """
+    Flatten a 9x9 board (list-of-lists or tuple-of-tuples) straight into
+    81 bytes: one allocation at the I/O boundary instead of nine row tuples.
+    """
+    return bytes(v for row in board for v in row)
+
+
+def from_cells(cells: Cells) -> List[List[int]]:
+    """Convert 81 cell bytes straight back to a mutable list-of-lists board"""
+    return [list(cells[r * 9:r * 9 + 9]) for r in range(9)]
+
+
+def cells_state(cells: Cells) -> Optional[State]:
+    """
+    Build the solver state for 81 cell bytes in a single pass, removing each
+    given digit from its row, column and box masks.
+    Returns None if a digit repeats within a unit (its bit is already gone).
+    """
+    rows, cols, boxes = [FULL_MASK] * 9, [FULL_MASK] * 9, [FULL_MASK] * 9
+    for i, value in enumerate(cells):
+        if value:
+            r, c, b = i // 9, i % 9, BOX_OF[i]
+            bit = digit_bit(value)
+            if not rows[r] & cols[c] & boxes[b] & bit:
+                return None
+            rows[r] &= ~bit
+            cols[c] &= ~bit
+            boxes[b] &= ~bit
+    return (cells, tuple(rows), tuple(cols), tuple(boxes))
+
+
+def cell_mask(state: State, r: int, c: int) -> int:
+    """Candidates of cell (r, c) as a bitmask: row, column and box masks ANDed together"""
+    _, rows, cols, boxes = state
+    return rows[r] & cols[c] & boxes[BOX_OF[r * 9 + c]]
+
+
+def peers_of(r: int, c: int) -> Tuple[Tuple[int, int], ...]:
+    """All cells sharing a row, column or box with (r, c), excluding (r, c) itself"""
+    box = BOX_OF[r * 9 + c]
+    return custom_filter(
+        lambda rc: rc != (r, c) and (rc[0] == r or rc[1] == c or BOX_OF[rc[0] * 9 + rc[1]] == box),
+        ALL_CELLS
     )
+
+
+PEERS = tuple(peers_of(r, c) for r, c in ALL_CELLS)  # PEERS[r * 9 + c] -> the 20 peers of cell (r, c)
+
+# Coordinates of each unit, indexed by row, column or box number (0-8)
+ROW_CELLS = tuple(tuple((r, c) for c in range(9)) for r in range(9))
+COL_CELLS = tuple(tuple((r, c) for r in range(9)) for c in range(9))
+BOX_CELLS = tuple(
+    tuple((br + dr, bc + dc) for dr in range(3) for dc in range(3))
+    for br in (0, 3, 6) for bc in (0, 3, 6)
+)
+
+UNITS = ROW_CELLS + COL_CELLS + BOX_CELLS  # the 27 units: 9 rows, 9 columns, 9 boxes
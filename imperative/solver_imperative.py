@@ -1,17 +1,20 @@
-from typing import List, Optional, Tuple, Callable
+from collections import deque
+from typing import Deque, List, Optional, Tuple, Callable
 # PARADIGM NOTE: Imperative solver works on mutable list-of-lists boards.
-# Higher-order programming appears via helpers from utils (apply_to_cells,
-# collect_from_cells) and the factory create_backtracking_solver.
+# Higher-order programming appears via the factory create_backtracking_solver.
 from imperative.utils_imperative import (
     Board,
     CandidatesBoard,
-    all_candidates,
-    cell_has_no_candidates,
     copy_board,
     has_conflict,
+    used_masks,
+    FULL_MASK,
+    PEERS,
+    UNITS,
+    BOX_OF,
+    DIGIT_OF_BIT,
+    POPCOUNT,
     is_solved,
-    apply_to_cells,
-    collect_from_cells,
 )
 
 
@@ -36,7 +39,8 @@ def create_backtracking_solver(
         if max_depth is not None and depth_counter[0] >= max_depth:
             return None
         depth_counter[0] += 1
-        return search(board)
+        # search solves in place, so give it a private copy of the caller's board
+        return search(copy_board(board))
     
     return solver
 
@@ -44,70 +48,160 @@ def create_backtracking_solver(
 def set_cell(board: Board, r: int, c: int, val: int) -> None:
     board[r][c] = val
 
+# Undo log: roll the board back to an earlier trail length
+def undo_to(board: Board, trail: List[Tuple[int, int]], mark: int) -> None:
+    while len(trail) > mark:
+        r, c = trail.pop()
+        board[r][c] = 0
+
+# Hidden singles: a digit with only one possible cell left in some unit
+def queue_hidden_singles(
+    board: Board, cands: CandidatesBoard, worklist: Deque[Tuple[int, int]]
+) -> bool:
+    """
+    Narrow each hidden single's mask to its digit and queue it.
+    Returns False if a digit has nowhere to go or a cell gets two of them.
+    """
+    for unit in UNITS:
+        # once: digits possible in some empty cell, more: in two or more
+        placed = once = more = 0
+        for r, c in unit:
+            v = board[r][c]
+            if v:
+                placed |= 1 << (v - 1)
+            else:
+                m = cands[r][c]
+                more |= once & m
+                once |= m
+        if placed | once != FULL_MASK:
+            return False
+        only = once & ~more
+        if not only:
+            continue
+        for r, c in unit:
+            if board[r][c] == 0 and cands[r][c] & only:
+                m = cands[r][c] & only
+                if m & (m - 1):
+                    return False
+                cands[r][c] = m
+                worklist.append((r, c))
+    return True
+
 # Constraint propagation: fill all singletons repeatedly until stable
-def propagate(board: Board) -> Optional[Board]:
+def propagate(
+    board: Board, trail: Optional[List[Tuple[int, int]]] = None
+) -> Optional[Tuple[Board, CandidatesBoard]]:
     """
-    Apply constraint propagation using custom higher-order function.
-    Uses collect_from_cells to find singleton candidates.
+    Fill naked singles from a peer work-list, then hidden singles, until neither applies.
+    Returns (board, candidate masks of the empty cells), or None on contradiction.
+    Placements are appended to `trail` (if given) so the caller can undo them.
     """
-    while True:
-        cands = all_candidates(board)
-        if cell_has_no_candidates(cands):
-            return None
+    row_used, col_used, box_used = used_masks(board)
+    cands: CandidatesBoard = [[0] * 9 for _ in range(9)]
+    worklist: Deque[Tuple[int, int]] = deque()
+    for r in range(9):
+        for c in range(9):
+            if board[r][c]:
+                continue
+            m = ~(row_used[r] | col_used[c] | box_used[BOX_OF[r * 9 + c]]) & FULL_MASK
+            if m == 0:
+                return None
+            cands[r][c] = m
+            # A single candidate is a mask with one bit set: m & (m - 1) == 0
+            if m & (m - 1) == 0:
+                worklist.append((r, c))
 
-        # Use our custom higher-order function collect_from_cells
-        # It takes a function and collects non-None results
-        def find_single(r: int, c: int) -> Optional[Tuple[int, int, int]]:
-            if board[r][c] == 0 and len(cands[r][c]) == 1:
-                return (r, c, cands[r][c][0])
+    while True:
+        while worklist:
+            r, c = worklist.popleft()
+            if board[r][c] != 0:
+                continue  # queued twice
+            bit = cands[r][c]
+            if bit == 0:
+                return None  # a peer took its last digit
+            set_cell(board, r, c, DIGIT_OF_BIT[bit])
+            if trail is not None:
+                trail.append((r, c))
+            for pr, pc in PEERS[r * 9 + c]:
+                if board[pr][pc] == 0 and cands[pr][pc] & bit:
+                    cands[pr][pc] &= ~bit
+                    m = cands[pr][pc]
+                    if m == 0:
+                        return None
+                    if m & (m - 1) == 0:
+                        worklist.append((pr, pc))
+        if not queue_hidden_singles(board, cands, worklist):
             return None
-        
-        # Higher-order function in action!
-        singles = collect_from_cells(find_single)
-
-        if not singles:
-            return board
-
-        for r, c, v in singles:
-            set_cell(board, r, c, v)
+        if not worklist:
+            return board, cands
 
 # Choose cell with minimum remaining values (MRV)
-def choose_mrv_cell(board: Board) -> Optional[Tuple[int, int, List[int]]]:
-    cands = all_candidates(board)
-    best: Optional[Tuple[int, int, List[int]]] = None
+def choose_mrv_cell(
+    board: Board, cands: CandidatesBoard
+) -> Optional[Tuple[int, int, int]]:
+    """
+    One integer loop over the candidate masks that propagate returned for
+    this same board, so they are not rebuilt. Counts come from the POPCOUNT
+    table, and the best cell's mask is returned as is, not decoded to digits.
+    Propagation leaves no single-candidate cell, so 2 is the minimum and the
+    scan stops at the first cell that has it.
+    """
+    best_r = best_c = -1
+    best_n = 10
+    best_mask = 0
     for r in range(9):
         for c in range(9):
-            if board[r][c] == 0:
-                cand_list = cands[r][c]
-                length = len(cand_list)
-                if length == 0:
-                    return None
-                if length == 1:
-                    return (r, c, cand_list)
-                if best is None or length < len(best[2]):
-                    best = (r, c, cand_list)
-    return best
+            if board[r][c]:
+                continue
+            m = cands[r][c]
+            n = POPCOUNT[m]
+            if n == 0:
+                return None
+            if n < best_n:
+                best_n, best_r, best_c, best_mask = n, r, c, m
+                if n <= 2:
+                    return (best_r, best_c, best_mask)
+    if best_r == -1:
+        return None
+    return (best_r, best_c, best_mask)
 
 # search with propagation + MRV
-def search(board: Board) -> Optional[Board]:
-    p_board = copy_board(board)
-    p = propagate(p_board)
-    if p is None:
+def search(board: Board, trail: Optional[List[Tuple[int, int]]] = None) -> Optional[Board]:
+    """
+    Backtracking on a single board mutated in place. Every cell filled on
+    the way down is logged on `trail`; a failed branch pops its entries and
+    clears those cells again, so no board is ever copied.
+    Returns the solved board, or None with `board` restored as it was given.
+    """
+    if trail is None:
+        trail = []
+    mark = len(trail)
+    res = propagate(board, trail)
+    if res is None:
+        undo_to(board, trail, mark)
         return None
-    if is_solved(p):
-        return p
+    board, cands = res
+    if is_solved(board):
+        return board
 
-    choice = choose_mrv_cell(p)
+    choice = choose_mrv_cell(board, cands)
     if choice is None:
+        undo_to(board, trail, mark)
         return None
 
-    r, c, candidates = choice
-    for val in candidates:
-        next_board = copy_board(p)
-        set_cell(next_board, r, c, val)
-        result = search(next_board)
+    # Walk the candidate bits lowest first: m & -m isolates the lowest set
+    # bit and XOR clears it, so no digit list is built
+    r, c, m = choice
+    while m:
+        bit = m & -m
+        m ^= bit
+        set_cell(board, r, c, DIGIT_OF_BIT[bit])
+        trail.append((r, c))
+        result = search(board, trail)
         if result is not None:
             return result
+        undo_to(board, trail, len(trail) - 1)
+    undo_to(board, trail, mark)
     return None
 
 
@@ -0,0 +1,38 @@
+import ctypes
+import os
+from typing import Optional
+
+# PARADIGM NOTE: Same algorithm as solver_imperative (naked + hidden single
+# propagation and MRV backtracking with an undo trail), implemented in C
+# (sudoku_core.c) on an 81-byte board and three arrays of 9-bit masks, and
+# called through ctypes.
+# The shared library has to be built first; without it this module raises
+# ImportError so callers can fall back to a pure-Python solver:
+#     gcc -O2 -shared -fPIC -o imperative/sudoku_core.so imperative/sudoku_core.c
+from imperative.utils_imperative import Board, has_conflict
+
+_LIB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sudoku_core.so")
+
+try:
+    _lib = ctypes.CDLL(_LIB_PATH)
+except OSError as exc:
+    raise ImportError(f"compiled solver core not found at {_LIB_PATH}") from exc
+
+_Cells = ctypes.c_uint8 * 81
+_lib.sudoku_solve.argtypes = (_Cells, _Cells)
+_lib.sudoku_solve.restype = ctypes.c_int
+
+
+def solve(input_board: Board) -> Optional[Board]:
+    """
+    Solve a list-of-lists board with the C core.
+    Flattens the board into 81 bytes, solves into a second buffer and
+    unflattens the result; the input board is never modified.
+    """
+    if has_conflict(input_board):
+        return None
+    cells = _Cells(*(v for row in input_board for v in row))
+    out = _Cells()
+    if not _lib.sudoku_solve(cells, out):
+        return None
+    return [list(out[r * 9:r * 9 + 9]) for r in range(9)]
@@ -0,0 +1,218 @@
+from typing import Optional
+
+import numpy as np
+from numba import njit
+
+# PARADIGM NOTE: Same algorithm as solver_imperative (naked + hidden single
+# propagation and MRV backtracking), but the board is a flat NumPy uint8 array of 81 cells and
+# candidates live in three uint16 bitmask arrays (bit v-1 set <=> digit v still
+# allowed). The kernels are compiled with Numba so the search loop runs as
+# native code without Python objects, and backtracking undoes moves in place
+# instead of copying.
+from imperative.utils_imperative import Board, has_conflict
+
+FULL_MASK = 0x1FF
+
+
+@njit(cache=True, nogil=True)
+def _init_masks(cells, rows, cols, boxes):
+    # Remove every given digit from the masks of its row, column and box
+    for idx in range(81):
+        v = cells[idx]
+        if v != 0:
+            r = idx // 9
+            c = idx % 9
+            bit = 1 << (v - 1)
+            rows[r] ^= bit
+            cols[c] ^= bit
+            boxes[(r // 3) * 3 + c // 3] ^= bit
+
+
+@njit(cache=True, nogil=True)
+def _toggle(cells, rows, cols, boxes, idx, v):
+    # Place v at idx when the cell is empty, remove it otherwise
+    r = idx // 9
+    c = idx % 9
+    bit = 1 << (v - 1)
+    cells[idx] = v if cells[idx] == 0 else 0
+    rows[r] ^= bit
+    cols[c] ^= bit
+    boxes[(r // 3) * 3 + c // 3] ^= bit
+
+
+@njit(cache=True, nogil=True)
+def _cell_mask(rows, cols, boxes, idx):
+    r = idx // 9
+    c = idx % 9
+    return np.int64(rows[r] & cols[c] & boxes[(r // 3) * 3 + c // 3])
+
+
+@njit(cache=True, nogil=True)
+def _popcount(m):
+    n = 0
+    while m:
+        m &= m - 1
+        n += 1
+    return n
+
+
+@njit(cache=True, nogil=True)
+def _undo(cells, rows, cols, boxes, trail, n):
+    # Clear every cell recorded on the trail, newest first
+    for k in range(n - 1, -1, -1):
+        _toggle(cells, rows, cols, boxes, trail[k], cells[trail[k]])
+
+
+@njit(cache=True, nogil=True)
+def _unit_cell(u, k):
+    # Cell k (0-8) of unit u: rows 0-8, columns 9-17, boxes 18-26
+    if u < 9:
+        return u * 9 + k
+    if u < 18:
+        return k * 9 + (u - 9)
+    u -= 18
+    return ((u // 3) * 3 + k // 3) * 9 + (u % 3) * 3 + k % 3
+
+
+@njit(cache=True, nogil=True)
+def _hidden_singles(cells, rows, cols, boxes, trail, n):
+    # Place the hidden singles of every unit (a digit with one possible
+    # cell), appending them to the trail from position n. Returns the new
+    # trail length, or -1 after undoing its own placements when a digit has
+    # nowhere to go or a cell gets two of them.
+    start = n
+    for u in range(27):
+        # once: digits possible in some empty cell, more: in two or more
+        placed = 0
+        once = 0
+        more = 0
+        for k in range(9):
+            idx = _unit_cell(u, k)
+            if cells[idx] != 0:
+                placed |= 1 << (cells[idx] - 1)
+            else:
+                m = _cell_mask(rows, cols, boxes, idx)
+                more |= once & m
+                once |= m
+        failed = (placed | once) != FULL_MASK
+        only = once & ~more
+        for k in range(9):
+            if failed or only == 0:
+                break
+            idx = _unit_cell(u, k)
+            if cells[idx] != 0:
+                continue
+            m = _cell_mask(rows, cols, boxes, idx) & only
+            if m == 0:
+                continue
+            if m & (m - 1) != 0:
+                failed = True
+                break
+            v = 1
+            while m > 1:
+                m >>= 1
+                v += 1
+            _toggle(cells, rows, cols, boxes, idx, v)
+            trail[n] = idx
+            n += 1
+        if failed:
+            for k in range(n - 1, start - 1, -1):
+                _toggle(cells, rows, cols, boxes, trail[k], cells[trail[k]])
+            return -1
+    return n
+
+
+@njit(cache=True, nogil=True)
+def _propagate_kernel(cells, rows, cols, boxes, trail):
+    # Fill naked singles, then hidden singles, until neither applies. Each
+    # placement is recorded on the trail; returns how many were made, or -1
+    # after undoing them on a contradiction.
+    n = 0
+    progress = True
+    while progress:
+        progress = False
+        for idx in range(81):
+            if cells[idx] != 0:
+                continue
+            m = _cell_mask(rows, cols, boxes, idx)
+            if m == 0:
+                _undo(cells, rows, cols, boxes, trail, n)
+                return -1
+            if m & (m - 1) == 0:
+                v = 1
+                while m > 1:
+                    m >>= 1
+                    v += 1
+                _toggle(cells, rows, cols, boxes, idx, v)
+                trail[n] = idx
+                n += 1
+                progress = True
+        if not progress:
+            m = _hidden_singles(cells, rows, cols, boxes, trail, n)
+            if m < 0:
+                _undo(cells, rows, cols, boxes, trail, n)
+                return -1
+            progress = m > n
+            n = m
+    return n
+
+
+@njit(cache=True, nogil=True)
+def _find_mrv(cells, rows, cols, boxes):
+    # Empty cell with the fewest candidates, or -1 when the board is full.
+    # After propagation no cell has fewer than 2, so 2 ends the scan early.
+    best = -1
+    best_count = 10
+    for idx in range(81):
+        if cells[idx] != 0:
+            continue
+        count = _popcount(_cell_mask(rows, cols, boxes, idx))
+        if count < best_count:
+            best = idx
+            best_count = count
+            if count <= 2:
+                break
+    return best
+
+
+@njit(cache=True, nogil=True)
+def _solve(cells, rows, cols, boxes):
+    # Constraint propagation (naked singles) + MRV backtracking. Placements
+    # are recorded on a trail and undone in place when the branch fails,
+    # so no board copies are made.
+    trail = np.empty(81, dtype=np.int64)
+    n = _propagate_kernel(cells, rows, cols, boxes, trail)
+    if n < 0:
+        return False
+
+    best = _find_mrv(cells, rows, cols, boxes)
+    if best == -1:
+        return True
+
+    m = _cell_mask(rows, cols, boxes, best)
+    for v in range(1, 10):
+        if m & (1 << (v - 1)):
+            _toggle(cells, rows, cols, boxes, best, v)
+            if _solve(cells, rows, cols, boxes):
+                return True
+            _toggle(cells, rows, cols, boxes, best, v)
+    _undo(cells, rows, cols, boxes, trail, n)
+    return False
+
+
+def solve(input_board: Board) -> Optional[Board]:
+    """
+    Solve a list-of-lists board with the Numba-compiled core.
+    Converts to a flat uint8 array once, solves in place and converts back.
+    The first call pays the JIT compile cost; cache=True keeps it on disk.
+    """
+    if has_conflict(input_board):
+        return None
+    cells = np.array(input_board, dtype=np.uint8).reshape(81)
+    rows = np.full(9, FULL_MASK, dtype=np.uint16)
+    cols = np.full(9, FULL_MASK, dtype=np.uint16)
+    boxes = np.full(9, FULL_MASK, dtype=np.uint16)
+    _init_masks(cells, rows, cols, boxes)
+    if not _solve(cells, rows, cols, boxes):
+        return None
+    return cells.reshape(9, 9).tolist()
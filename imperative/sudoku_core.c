@@ -0,0 +1,216 @@
+/*
+ * Native solver core for the imperative solver, loaded with ctypes by
+ * imperative/solver_imperative_c.py.
+ *
+ * Same algorithm as solver_imperative (naked + hidden single propagation
+ * and MRV backtracking): the board is 81 bytes, candidates live in three arrays of
+ * 9-bit masks (bit v-1 set <=> digit v still allowed), and backtracking
+ * undoes moves from a trail instead of copying the board.
+ *
+ * Build (from the repository root):
+ *     gcc -O2 -shared -fPIC -o imperative/sudoku_core.so imperative/sudoku_core.c
+ */
+#include <stdint.h>
+#include <string.h>
+
+#define FULL_MASK 0x1FF
+
+typedef struct {
+    uint8_t cells[81];
+    uint16_t rows[9];
+    uint16_t cols[9];
+    uint16_t boxes[9];
+} grid_t;
+
+static const uint8_t BOX_IDX[81] = {
+    0, 0, 0, 1, 1, 1, 2, 2, 2,
+    0, 0, 0, 1, 1, 1, 2, 2, 2,
+    0, 0, 0, 1, 1, 1, 2, 2, 2,
+    3, 3, 3, 4, 4, 4, 5, 5, 5,
+    3, 3, 3, 4, 4, 4, 5, 5, 5,
+    3, 3, 3, 4, 4, 4, 5, 5, 5,
+    6, 6, 6, 7, 7, 7, 8, 8, 8,
+    6, 6, 6, 7, 7, 7, 8, 8, 8,
+    6, 6, 6, 7, 7, 7, 8, 8, 8,
+};
+
+static inline unsigned cell_mask(const grid_t *g, int idx)
+{
+    return g->rows[idx / 9] & g->cols[idx % 9] & g->boxes[BOX_IDX[idx]];
+}
+
+/* Place v at idx when the cell is empty, remove it otherwise */
+static inline void toggle(grid_t *g, int idx, int v)
+{
+    uint16_t bit = (uint16_t)(1u << (v - 1));
+    g->cells[idx] = g->cells[idx] ? 0 : (uint8_t)v;
+    g->rows[idx / 9] ^= bit;
+    g->cols[idx % 9] ^= bit;
+    g->boxes[BOX_IDX[idx]] ^= bit;
+}
+
+/* Cell k (0-8) of unit u: rows 0-8, columns 9-17, boxes 18-26 */
+static inline int unit_cell(int u, int k)
+{
+    if (u < 9)
+        return u * 9 + k;
+    if (u < 18)
+        return k * 9 + (u - 9);
+    u -= 18;
+    return ((u / 3) * 3 + k / 3) * 9 + (u % 3) * 3 + k % 3;
+}
+
+/* Clear every cell recorded on the trail, newest first */
+static void undo(grid_t *g, const uint8_t *trail, int n)
+{
+    for (int k = n - 1; k >= 0; k--)
+        toggle(g, trail[k], g->cells[trail[k]]);
+}
+
+/*
+ * Place the hidden singles of every unit (a digit with one possible cell),
+ * appending each to the trail and advancing *n. Returns how many were
+ * placed, or -1 when a digit has nowhere to go or a cell gets two of them.
+ */
+static int hidden_singles(grid_t *g, uint8_t *trail, int *n)
+{
+    int start = *n;
+    for (int u = 0; u < 27; u++) {
+        /* once: digits possible in some empty cell, more: in two or more */
+        unsigned placed = 0, once = 0, more = 0;
+        for (int k = 0; k < 9; k++) {
+            int idx = unit_cell(u, k);
+            if (g->cells[idx]) {
+                placed |= 1u << (g->cells[idx] - 1);
+            } else {
+                unsigned m = cell_mask(g, idx);
+                more |= once & m;
+                once |= m;
+            }
+        }
+        if ((placed | once) != FULL_MASK)
+            return -1;
+        unsigned only = once & ~more;
+        for (int k = 0; only && k < 9; k++) {
+            int idx = unit_cell(u, k);
+            if (g->cells[idx])
+                continue;
+            unsigned m = cell_mask(g, idx) & only;
+            if (m == 0)
+                continue;
+            if (m & (m - 1))
+                return -1;
+            toggle(g, idx, __builtin_ctz(m) + 1);
+            trail[(*n)++] = (uint8_t)idx;
+        }
+    }
+    return *n - start;
+}
+
+/*
+ * Fill naked singles, then hidden singles, until neither applies,
+ * recording each placement on the trail. Returns how many were placed,
+ * or -1 after undoing them on a contradiction.
+ */
+static int propagate(grid_t *g, uint8_t *trail)
+{
+    int n = 0;
+    int progress = 1;
+    while (progress) {
+        progress = 0;
+        for (int idx = 0; idx < 81; idx++) {
+            if (g->cells[idx])
+                continue;
+            unsigned m = cell_mask(g, idx);
+            if (m == 0) {
+                undo(g, trail, n);
+                return -1;
+            }
+            if ((m & (m - 1)) == 0) {
+                toggle(g, idx, __builtin_ctz(m) + 1);
+                trail[n++] = (uint8_t)idx;
+                progress = 1;
+            }
+        }
+        if (!progress) {
+            int placed = hidden_singles(g, trail, &n);
+            if (placed < 0) {
+                undo(g, trail, n);
+                return -1;
+            }
+            progress = placed > 0;
+        }
+    }
+    return n;
+}
+
+/* Empty cell with the fewest candidates, or -1 when the board is full */
+static int find_mrv(const grid_t *g)
+{
+    int best = -1;
+    int best_count = 10;
+    for (int idx = 0; idx < 81; idx++) {
+        if (g->cells[idx])
+            continue;
+        int count = __builtin_popcount(cell_mask(g, idx));
+        if (count < best_count) {
+            best = idx;
+            best_count = count;
+            /* Propagation leaves no singles, so 2 cannot be beaten */
+            if (count <= 2)
+                break;
+        }
+    }
+    return best;
+}
+
+static int search(grid_t *g)
+{
+    uint8_t trail[81];
+    int n = propagate(g, trail);
+    if (n < 0)
+        return 0;
+
+    int best = find_mrv(g);
+    if (best < 0)
+        return 1;
+
+    /* Try each candidate digit, lowest bit first */
+    unsigned m = cell_mask(g, best);
+    while (m) {
+        int v = __builtin_ctz(m) + 1;
+        m &= m - 1;
+        toggle(g, best, v);
+        if (search(g))
+            return 1;
+        toggle(g, best, v);
+    }
+    undo(g, trail, n);
+    return 0;
+}
+
+/*
+ * Solve the 81-byte row-major board `in` (0 = empty) into `out`.
+ * Returns 1 when solved, 0 when the givens conflict or there is no solution.
+ */
+int sudoku_solve(const uint8_t *in, uint8_t *out)
+{
+    grid_t g;
+    memset(g.cells, 0, sizeof g.cells);
+    for (int i = 0; i < 9; i++)
+        g.rows[i] = g.cols[i] = g.boxes[i] = FULL_MASK;
+
+    for (int idx = 0; idx < 81; idx++) {
+        int v = in[idx];
+        if (v == 0)
+            continue;
+        if (v > 9 || !(cell_mask(&g, idx) & (1u << (v - 1))))
+            return 0;
+        toggle(&g, idx, v);
+    }
+
+    if (!search(&g))
+        return 0;
+    memcpy(out, g.cells, sizeof g.cells);
+    return 1;
+}
@@ -1,4 +1,4 @@
-from typing import List, Optional, Callable, TypeVar
+from typing import List, Optional, Callable, Tuple, TypeVar
 
 # PARADIGM NOTE: Imperative code uses mutable list-of-lists for boards.
 # Higher-order programming here is via custom helpers (apply_to_cells,
@@ -6,7 +6,21 @@ from typing import List, Optional, Callable, TypeVar
 
 # Types for mutable boards
 Board = List[List[int]]              # mutable 9x9 board
-CandidatesBoard = List[List[List[int]]]  # 9x9 of candidate lists
+CandidatesBoard = List[List[int]]    # 9x9 of candidate bitmasks (bit d-1 set <=> digit d allowed)
+
+FULL_MASK = 0x1FF                                      # all nine digits
+POPCOUNT = tuple(bin(m).count('1') for m in range(512))  # number of candidates in a mask
+
+# Lookup tables for the fixed 9x9 shape, so inner loops index instead of computing
+BOX_OF = tuple((r // 3) * 3 + c // 3 for r in range(9) for c in range(9))  # BOX_OF[r * 9 + c] -> box 0-8
+ROW_CELLS = tuple(tuple((r, c) for c in range(9)) for r in range(9))  # ROW_CELLS[r] -> the 9 cells of row r
+COL_CELLS = tuple(tuple((r, c) for r in range(9)) for c in range(9))  # COL_CELLS[c] -> the 9 cells of column c
+BOX_CELLS = tuple(
+    tuple((br + dr, bc + dc) for dr in range(3) for dc in range(3))
+    for br in (0, 3, 6) for bc in (0, 3, 6)
+)                                                       # BOX_CELLS[b] -> the 9 (r, c) cells of box b
+UNITS = ROW_CELLS + COL_CELLS + BOX_CELLS               # all 27 rows, columns and boxes
+DIGIT_OF_BIT = tuple(m.bit_length() if m and m & (m - 1) == 0 else 0 for m in range(512))  # single-bit mask -> its digit
 
 T = TypeVar('T')
 
@@ -75,13 +89,8 @@ def collect_with_predicate(
     return results
 
 def copy_board(board: Board) -> Board:
-    new_board: Board = []
-    for row in board:
-        new_row = []
-        for v in row:
-            new_row.append(v)
-        new_board.append(new_row)
-    return new_board
+    # One C-level slice per row instead of appending the 81 cells one by one
+    return [row[:] for row in board]
 
 def row_values(board: Board, r: int) -> List[int]:
     vals: List[int] = []
@@ -101,102 +110,122 @@ def col_values(board: Board, c: int) -> List[int]:
 
 
 def box_values(board: Board, r: int, c: int) -> List[int]:
-    br = (r // 3) * 3
-    bc = (c // 3) * 3
     vals: List[int] = []
-    for rr in range(br, br + 3):
-        for cc in range(bc, bc + 3):
-            v = board[rr][cc]
-            if v != 0:
-                vals.append(v)
+    for rr, cc in BOX_CELLS[BOX_OF[r * 9 + c]]:
+        v = board[rr][cc]
+        if v != 0:
+            vals.append(v)
     return vals
 
 
-def candidates_for(board: Board, r: int, c: int) -> List[int]:
-    if board[r][c] != 0:
-        return [board[r][c]]
-    used: List[int] = []
-    for x in row_values(board, r):
-        if x not in used:
-            used.append(x)
-
-    for x in col_values(board, c):
-        if x not in used:
-            used.append(x)
+def used_masks(board: Board) -> Tuple[List[int], List[int], List[int]]:
+    """
+    One pass over the board: for every row, column and box, a 9-bit mask
+    of the digits already placed in it (bit d-1 set <=> digit d used).
+    """
+    row_used = [0] * 9
+    col_used = [0] * 9
+    box_used = [0] * 9
+    for r in range(9):
+        for c in range(9):
+            v = board[r][c]
+            if v:
+                bit = 1 << (v - 1)
+                row_used[r] |= bit
+                col_used[c] |= bit
+                box_used[BOX_OF[r * 9 + c]] |= bit
+    return row_used, col_used, box_used
 
-    for x in box_values(board, r, c):
-        if x not in used:
-            used.append(x)
 
-    cands: List[int] = []
-    for x in range(1, 10):
-        if x not in used:
-            cands.append(x)
-    return cands
+def candidates_for(board: Board, r: int, c: int) -> int:
+    """Candidates of one cell as a bitmask; a filled cell returns its own digit's bit"""
+    if board[r][c] != 0:
+        return 1 << (board[r][c] - 1)
+    used = 0
+    for v in board[r]:
+        if v:
+            used |= 1 << (v - 1)
+    for rr in range(9):
+        v = board[rr][c]
+        if v:
+            used |= 1 << (v - 1)
+    for rr, cc in BOX_CELLS[BOX_OF[r * 9 + c]]:
+        v = board[rr][cc]
+        if v:
+            used |= 1 << (v - 1)
+    return ~used & FULL_MASK
 
 
 def all_candidates(board: Board) -> CandidatesBoard:
+    """
+    Candidate bitmasks for every cell. The row/col/box used-masks are built
+    once, so each empty cell costs a single ~(row | col | box) & FULL_MASK.
+    """
+    row_used, col_used, box_used = used_masks(board)
     cboard: CandidatesBoard = []
     for r in range(9):
-        row_list: List[List[int]] = []
+        row_list: List[int] = []
         for c in range(9):
-            row_list.append(candidates_for(board, r, c))
+            v = board[r][c]
+            if v:
+                row_list.append(1 << (v - 1))
+            else:
+                row_list.append(~(row_used[r] | col_used[c] | box_used[BOX_OF[r * 9 + c]]) & FULL_MASK)
         cboard.append(row_list)
     return cboard
 
 
+def peers(r: int, c: int) -> List[Tuple[int, int]]:
+    """The 20 cells sharing a row, column or box with (r, c), excluding (r, c)"""
+    result: List[Tuple[int, int]] = []
+    for i in range(9):
+        if i != c:
+            result.append((r, i))
+        if i != r:
+            result.append((i, c))
+    for rr, cc in BOX_CELLS[BOX_OF[r * 9 + c]]:
+        if rr != r and cc != c:
+            result.append((rr, cc))
+    return result
+
+
+PEERS = tuple(tuple(peers(r, c)) for r in range(9) for c in range(9))  # PEERS[r * 9 + c] -> the 20 peers of (r, c)
+
+
 def is_solved(board: Board) -> bool:
-    for r in range(9):
-        for c in range(9):
-            if board[r][c] == 0:
-                return False
+    """No empty cell left: one C-level `0 in row` scan per row, not 81 reads"""
+    for row in board:
+        if 0 in row:
+            return False
     return True
 
 
 def has_conflict(board: Board) -> bool:
     """
     Check if board has any conflicts (duplicate values in row/col/box).
-    Uses custom higher-order functions for cleaner implementation.
+    Single pass using one 9-bit mask per row, column and box; stops at the
+    first duplicate. Only integer operations, no lists or sets.
     """
-    def dup(xs: List[int]) -> bool:
-        xs2 = []
-        for x in xs:
-            if x != 0:
-                xs2.append(x)
-        return len(xs2) != len(set(xs2))
-
-    # Check rows
+    row_seen = [0] * 9
+    col_seen = [0] * 9
+    box_seen = [0] * 9
     for r in range(9):
-        if dup(board[r]):
-            return True
-    
-    # Check columns using our custom higher-order function
-    for c in range(9):
-        # Use collect_with_predicate instead of awkward apply_to_cells
-        col_vals = collect_with_predicate(
-            predicate=lambda r, col: col == c,  # Only cells in this column
-            extractor=lambda r, col: board[r][col]  # Extract the value
-        )
-        if dup(col_vals):
-            return True
-
-    # Check 3x3 boxes
-    for br in (0, 3, 6):
-        for bc in (0, 3, 6):
-            vals: List[int] = []
-            for rr in range(br, br + 3):
-                for cc in range(bc, bc + 3):
-                    v = board[rr][cc]
-                    if v != 0:
-                        vals.append(v)
-            if len(vals) != len(set(vals)):
-                return True
+        for c in range(9):
+            v = board[r][c]
+            if v:
+                bit = 1 << (v - 1)
+                b = BOX_OF[r * 9 + c]
+                if row_seen[r] & bit or col_seen[c] & bit or box_seen[b] & bit:
+                    return True
+                row_seen[r] |= bit
+                col_seen[c] |= bit
+                box_seen[b] |= bit
     return False
 
 
 def cell_has_no_candidates(cands_board: CandidatesBoard) -> bool:
     for r in range(9):
         for c in range(9):
-            if len(cands_board[r][c]) == 0:
+            if cands_board[r][c] == 0:
                 return True
     return False
@@ -46,6 +46,9 @@ hardpuzzle = [
 
 # sol_imp = solve_imp(puzzle)
 # sol_fun = solve_fun(puzzle)
+# The two solvers search differently (the functional one adds naked pairs,
+# LCV ordering and memoization), but a puzzle with a unique solution must
+# come out the same from both
 sol_imp_hard = solve_imp(hardpuzzle)
 sol_fun_hard = solve_fun(hardpuzzle)
 